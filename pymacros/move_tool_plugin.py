@@ -18,8 +18,7 @@
 
 from __future__ import annotations
 from abc import abstractmethod
-from dataclasses import dataclass
-from functools import cached_property
+from dataclasses import dataclass, field
 from typing import *
 import os 
 import sys
@@ -34,6 +33,13 @@ from klayout_plugin_utils.selection_filter_options import SelectionFilterOptions
 from klayout_plugin_utils.str_enum_compat import StrEnum
 
 
+# NOTE: the mouse/key handlers are called very frequently, 
+#       so we resolve the button state constants once
+_LEFT_BUTTON = pya.ButtonState.LeftButton
+_RIGHT_BUTTON = pya.ButtonState.RightButton
+_SHIFT_KEY = pya.ButtonState.ShiftKey
+
+
 class MoveQuicklyToolState(StrEnum):
     INACTIVE = "inactive"
     SELECTING = "selecting"               # wait for click to happen to get moving
@@ -45,13 +51,33 @@ class ContainmentConstraint(StrEnum):
     SEARCH_BOX_ENCLOSES_OBJECT = "search_box_encloses_object"
     SEARCH_BOX_OVERLAPS_OBJECT = "search_box_overlaps_object"
 
-    def matches(self, search_box: pya.Box, candidate_box: pya.Box) -> bool:
+    def compile(self, search_box: pya.Box) -> Callable[[pya.Box], bool]:
+        # NOTE: resolves the constraint once per search instead of once per candidate
         if self == ContainmentConstraint.SEARCH_BOX_ENCLOSES_OBJECT:
-            return candidate_box.inside(search_box)
+            return lambda candidate_box: candidate_box.inside(search_box)
         elif self == ContainmentConstraint.SEARCH_BOX_OVERLAPS_OBJECT:
-            return candidate_box.touches(search_box)
+            return lambda candidate_box: candidate_box.touches(search_box)
         else:
-            raise NotImplementedError(f"ContainmentConstraint.matches: unknown type {self}")
+            raise NotImplementedError(f"ContainmentConstraint.compile: unknown type {self}")
+
+
+# NOTE: lightweight replacement for functools.cached_property (which locks on access);
+#       as a non-data descriptor, once the value is stored in the instance __dict__,
+#       attribute lookups resolve it directly without calling into the descriptor
+class _cached:
+    def __init__(self, func: Callable):
+        self.func = func
+        self.name = func.__name__
+
+    def __set_name__(self, owner: type, name: str):
+        self.name = name
+
+    def __get__(self, instance, owner: Optional[type] = None):
+        if instance is None:
+            return self
+        value = self.func(instance)
+        instance.__dict__[self.name] = value
+        return value
 
 
 @dataclass
@@ -74,6 +100,25 @@ class Instance(SelectableObject):
 @dataclass
 class MoveQuicklyToolSelection:
     objects: List[Union[Instance, ShapeOfInstance]]
+    
+    # NOTE: partitioned once at construction time, so that the accessors and transform()
+    #       don't have to dispatch on the type of each object
+    _instances: List[Instance] = field(init=False, repr=False, compare=False)
+    _shapes: List[ShapeOfInstance] = field(init=False, repr=False, compare=False)
+    
+    # NOTE: the aggregate bbox is computed eagerly and kept up to date by transform(),
+    #       it is read on every preview update, so a plain attribute is cheapest
+    bbox: pya.Box = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self._instances = []
+        self._shapes = []
+        for o in self.objects:
+            if isinstance(o, Instance):
+                self._instances.append(o)
+            elif isinstance(o, ShapeOfInstance):
+                self._shapes.append(o)
+        self.bbox = self._compute_bbox()
 
     def is_single_selection(self) -> bool:
         return len(self.objects) == 1
@@ -81,55 +126,104 @@ class MoveQuicklyToolSelection:
     def is_multi_selection(self) -> bool:
         return len(self.objects) >= 2
         
-    def bbox(self, view: pya.LayoutView) -> pya.Box:
-        r = pya.Region()
-        for o in self.objects:
-            bbox = o.bbox
-            if isinstance(o, ShapeOfInstance) and o.shape.is_text() and 'TextInfo' in dir(pya):
-                ti = pya.TextInfo(view)
-                bbox = ti.bbox(o.shape)
-            r.insert(bbox)
-        return r.bbox()
+    def _compute_bbox(self) -> pya.Box:
+        if len(self.objects) == 0:
+            return pya.Box()
+        if len(self.objects) == 1:
+            return self.objects[0].bbox
+
+        # NOTE: a plain min/max reduction is sufficient for the overall bounding box,
+        #       there is no need to build a pya.Region for that
+        it = iter(self.objects)
+        first = next(it).bbox
+        l, b, r, t = first.left, first.bottom, first.right, first.top
+        for o in it:
+            box = o.bbox
+            if box.left < l:
+                l = box.left
+            if box.bottom < b:
+                b = box.bottom
+            if box.right > r:
+                r = box.right
+            if box.top > t:
+                t = box.top
+        return pya.Box(l, b, r, t)
     
-    def position(self, view: pya.LayoutView) -> pya.Point:
-        bbox = self.bbox(view)
+    @property
+    def position(self) -> pya.Point:
+        bbox = self.bbox
         return pya.Point(bbox.left, bbox.bottom)
 
+    @property
+    def counts(self) -> Tuple[int, int]:  # (number of instances, number of shapes)
+        return len(self._instances), len(self._shapes)
+
     def all_instances(self) -> List[Instance]:
-        return [o for o in self.objects if isinstance(o, Instance)]
+        return self._instances
 
     def all_shapes_of_instance(self) -> List[ShapeOfInstance]:
-        return [o for o in self.objects if isinstance(o, ShapeOfInstance)]
+        return self._shapes
+
+    @_cached
+    def text_objects(self) -> List[ShapeOfInstance]:
+        return [o for o in self._shapes if o.shape.is_text()]
+
+    def refresh_text_bboxes(self, text_info: pya.TextInfo) -> bool:  # returns True if any bbox changed
+        # NOTE: the rendered bbox of a text depends on the view (zoom, text settings),
+        #       so it has to be refreshed when the view changes
+        changed = False
+        for o in self.text_objects:
+            bbox = text_info.bbox(o.shape)
+            if bbox != o.bbox:
+                o.bbox = bbox
+                changed = True
+        if changed:
+            self.bbox = self._compute_bbox()
+        return changed
         
+    @_cached
     def as_transformees(self) -> List[Union[pya.Instance, pya.Shape]]:
-        tl = []
-        tl += [o.instance for o in self.objects if isinstance(o, Instance)]
-        for o in self.objects:
-            if not isinstance(o, ShapeOfInstance):
-                continue
-            if len(o.path.path) == 0:
-                tl += [o.shape]  # directly move this shape
+        tl = [o.instance for o in self._instances]
+        for o in self._shapes:
+            if o.path.path_length() == 0:
+                tl.append(o.shape)  # directly move this shape
             else:  # the shape belongs to a subcell, never move the shape alone, always the whole cell
                 # TODO: this should be dead code?!?!!
-                tl += [o.path[0].inst()]
+                tl.append(o.path.path_nth(0).inst())
         return tl
 
-    def transform(self, trans: pya.DTrans):
+    def transform(self, trans: pya.DTrans, dbu: float):
         # NOTE: see https://github.com/KLayout/klayout/issues/2150#issuecomment-3282412316
         #       when manipulating Shapes/Instances, the Shape instances are potentially replaced by KLayout
         #       so we have to update the ObjectInstPath fields
-        for o in self.objects:
-            if isinstance(o, Instance):
-                o.instance.transform(trans)
-                o.path.path = [pya.InstElement(o.instance)]
-            elif not isinstance(o, ShapeOfInstance):
-                continue
-            elif len(o.path.path) == 0:
-                o.shape.transform(trans)  # directly move this shape
-                o.path.shape = o.shape
+        # NOTE: the bounding boxes are moved along locally, so there is no need
+        #       to query the selection from KLayout again after the move
+        # NOTE: KLayout has no API to transform an arbitrary subset of shapes/instances in one call
+        #       (Cell.transform would move everything), so at least the loop invariants are hoisted
+        displacement = trans.disp.to_itype(dbu)
+        InstElement = pya.InstElement
+        for o in self._instances:
+            instance = o.instance
+            instance.transform(trans)
+            o.path.path = [InstElement(instance)]
+            o.bbox = o.bbox.moved(displacement)
+        for o in self._shapes:
+            path = o.path
+            if path.path_length() == 0:
+                shape = o.shape
+                shape.transform(trans)  # directly move this shape
+                path.shape = shape
+                o.bbox = o.bbox.moved(displacement)
+        # NOTE: selected_objects() only creates ShapeOfInstance for top-level shapes (path_length() == 0),
+        #       so every object was moved and the aggregate bbox moves by the same displacement
+        self.bbox = self.bbox.moved(displacement)
+        # invalidate cached values
+        self.__dict__.pop('as_transformees', None)
 
 @dataclass
 class MoveOperation:
+    __slots__ = ()
+    
     @abstractmethod
     def effective_delta(self) -> pya.DVector:
         raise NotImplementedError()
@@ -137,20 +231,28 @@ class MoveOperation:
 
 @dataclass
 class MouseMoveOperation(MoveOperation):
+    __slots__ = ('original_position', 'snapped_position', 'from_cursor', 'to_cursor', 'snapped_cursor_delta',
+                 '_snap_correction')
+    
     original_position: pya.DPoint
     snapped_position: pya.DPoint
     from_cursor: pya.DPoint                # original cursor
     to_cursor: pya.DPoint                  # original cursor
     snapped_cursor_delta: pya.DVector      # snap-to-grid cursor delta
     
+    def __post_init__(self):
+        # NOTE: because of snap-to-grid, we might have to correct the original position of the selection,
+        #       the positions don't change during a move (only the cursor does), so this is computed once
+        self._snap_correction = self.snapped_position - self.original_position
+    
     def effective_delta(self) -> pya.DVector:
-        # NOTE: because of snap-to-grid, we might have to correct the original position of the selection
-        delta = self.snapped_position - self.original_position + self.snapped_cursor_delta
-        return delta
+        return self._snap_correction + self.snapped_cursor_delta
 
 
 @dataclass
 class TextMoveOperation(MoveOperation):
+    __slots__ = ('original_position', 'x', 'y', 'dx', 'dy')
+    
     original_position: pya.DPoint
 
     x: float
@@ -169,6 +271,16 @@ class MoveQuicklyToolSetupDock(pya.QDockWidget):
         self.setupWidget = MoveQuicklyToolSetupWidget(host)
         self.setWidget(self.setupWidget)
         self.setWindowTitle("Move Quickly Tool")
+        # NOTE: tracked via show/hide events, so the hot paths don't have to ask Qt
+        self.is_shown = False
+
+    def showEvent(self, event):
+        self.is_shown = True
+        event.accept()
+        
+    def hideEvent(self, event):
+        self.is_shown = False
+        event.accept()
 
     def updateState(self, state: MoveQuicklyToolState):
         self.setupWidget.updateState(state)
@@ -242,6 +354,10 @@ class MoveQuicklyToolSetupWidget(pya.QWidget):
         self.layout.setRowStretch(6, 3)
         self.setLayout(self.layout)
         
+        # NOTE: last values pushed into the widgets, to skip setters which wouldn't change anything
+        self._last_selection_counts: Optional[Tuple[int, int]] = None
+        self._last_enabled: Optional[bool] = None
+        
     def hideEvent(self, event):
         event.accept()
 
@@ -252,38 +368,34 @@ class MoveQuicklyToolSetupWidget(pya.QWidget):
         if selection is None or \
            len(selection.objects) == 0:
             return "None"
-        def format_objects(singular: str, objects: List[Union[Instance, ShapeOfInstance]]):
-            if objects is not None:
-                n = len(objects)
-                if n == 0:
-                    return ''
-                elif n == 1:
-                    return f"1 {singular}"
-                else:
-                    return f"{n} {singular}s"
-            return ''
-        
-        instances = format_objects("instance", selection.all_instances())
-        shapes = format_objects("shape", selection.all_shapes_of_instance())
-        if instances == '':
-            return shapes
-        elif shapes == '':
-            return instances
-        else:
-            return f"{instances}, {shapes}"
+        
+        n_instances, n_shapes = selection.counts
+        
+        parts = []
+        if n_instances:
+            parts.append(f"{n_instances} instance{'s' if n_instances != 1 else ''}")
+        if n_shapes:
+            parts.append(f"{n_shapes} shape{'s' if n_shapes != 1 else ''}")
+        return ', '.join(parts)
 
     def updateSelection(self, selection: Optional[MoveQuicklyToolSelection]):
-        txt = self.format_selection(selection)
-        self.selection_value.setText(f"<a href=\"show-properties\">{txt}</a>")
+        # NOTE: the summary only depends on the counts, so it is only formatted if they changed
+        counts = (0, 0) if selection is None else selection.counts
+        if counts != self._last_selection_counts:
+            self._last_selection_counts = counts
+            txt = self.format_selection(selection)
+            self.selection_value.setText(f"<a href=\"show-properties\">{txt}</a>")
         
         enabled = selection is not None
-        self.x_value.setEnabled(enabled)
-        self.y_value.setEnabled(enabled)
-        self.dx_value.setEnabled(enabled)
-        self.dy_value.setEnabled(enabled)
+        if enabled != self._last_enabled:
+            self._last_enabled = enabled
+            self.x_value.setEnabled(enabled)
+            self.y_value.setEnabled(enabled)
+            self.dx_value.setEnabled(enabled)
+            self.dy_value.setEnabled(enabled)
         
         if enabled:
-            dpos: pya.DPoint = selection.position(self.host.view).to_dtype(self.host.dbu)
+            dpos: pya.DPoint = self.host.selection_dposition
             if dpos is None:
                 self.x_value.setValue(0.0)
                 self.y_value.setValue(0.0)
@@ -307,10 +419,19 @@ class MoveQuicklyToolSetupWidget(pya.QWidget):
         pya.MainWindow.instance().menu().action('edit_menu.show_properties').trigger()
 
     def updatePositionValues(self, x: float, y: float, dx: float, dy: float):
-        self.x_value.setValue(x)
-        self.y_value.setValue(y)
-        self.dx_value.setValue(dx)
-        self.dy_value.setValue(dy)
+        # NOTE: this is called while moving, the spin boxes are only used for display here,
+        #       so we suppress the intermediate valueChanged signal emissions
+        spin_boxes = (self.x_value, self.y_value, self.dx_value, self.dy_value)
+        for sb in spin_boxes:
+            sb.blockSignals(True)
+        try:
+            self.x_value.setValue(x)
+            self.y_value.setValue(y)
+            self.dx_value.setValue(dx)
+            self.dy_value.setValue(dy)
+        finally:
+            for sb in spin_boxes:
+                sb.blockSignals(False)
 
     def navigateToNextTextField(self):
         self.focusNextPrevChild(next=True)
@@ -351,8 +472,12 @@ class MoveQuicklyToolSetupWidget(pya.QWidget):
         if key in (pya.KeyCode.Enter, pya.KeyCode.Return):
             if Debugging.DEBUG:
                 debug("keyPressEvent: enter!")
+            
+            if self.host._commit_pending:  # a canvas click commit is already scheduled
+                event.accept()
+                return
                 
-            orig_pos = self.host.selection.position(self.host.view).to_dtype(self.host.dbu)
+            orig_pos = self.host.selection_dposition
             op = TextMoveOperation(orig_pos,
                                    self.x_value.value, self.y_value.value,
                                    self.dx_value.value, self.dy_value.value)
@@ -371,8 +496,13 @@ class MoveQuicklyToolPlugin(pya.Plugin):
         self._state = MoveQuicklyToolState.INACTIVE
 
         self._selection: Optional[MoveQuicklyToolSelection] = None
+        self._selection_dposition: Optional[pya.DPoint] = None
         self.move_preview_markers = []
         self.drag_selection_markers = []
+        self._last_preview_delta: Optional[pya.DVector] = None
+        self._preview_base_selection: Optional[MoveQuicklyToolSelection] = None
+        self._preview_base_dbox: Optional[pya.DBox] = None
+        self._preview_base_dtexts: List[pya.DText] = []
         
         self.editor_options = None
         
@@ -380,8 +510,35 @@ class MoveQuicklyToolPlugin(pya.Plugin):
         self.drag_selection_from_dpoint = None
         self.drag_selection_to_dpoint = None
         self.move_from_dpoint = None
+        self._move_from_snapped_dpoint: Optional[pya.DPoint] = None
         self.move_to_dpoint = None
         self.move_operation = None
+        self._pending_move_dpoint: Optional[pya.DPoint] = None
+        self._move_update_scheduled = False
+        self._drag_update_scheduled = False
+        self._move_anchor_orig_pos: Optional[pya.DPoint] = None
+        self._move_anchor_snapped_pos: Optional[pya.DPoint] = None
+        self._last_snapped_to_cursor: Optional[pya.DPoint] = None
+        self._commit_pending = False
+        self._pending_commit_operation: Optional[MoveOperation] = None
+        
+        # NOTE: per-state handlers of the mouse button events, resolved by a single dict lookup
+        MouseEventHandler = Callable[[pya.DPoint, int, bool], bool]
+        self._released_handlers: Dict[MoveQuicklyToolState, MouseEventHandler] = {
+            MoveQuicklyToolState.INACTIVE:       self._ignore_mouse_event,
+            MoveQuicklyToolState.SELECTING:      self._released_while_selecting,
+            MoveQuicklyToolState.DRAG_SELECTING: self._released_while_drag_selecting,
+            MoveQuicklyToolState.MOVING:         self._ignore_mouse_event,
+        }
+        self._left_click_handlers: Dict[MoveQuicklyToolState, MouseEventHandler] = {
+            MoveQuicklyToolState.INACTIVE:       self._ignore_mouse_event,
+            MoveQuicklyToolState.SELECTING:      self._left_click_while_selecting,
+            MoveQuicklyToolState.DRAG_SELECTING: self._ignore_mouse_event,
+            MoveQuicklyToolState.MOVING:         self._left_click_while_moving,
+        }
+        
+        self._visible_layer_indexes: Optional[Tuple[int, ...]] = None
+        self._view_events_connected = False
 
     @property
     def cell_view(self) -> pya.CellView:
@@ -419,22 +576,47 @@ class MoveQuicklyToolPlugin(pya.Plugin):
         # if Debugging.DEBUG:
         #    debug(f"setting selection to {selection}")
         self._selection = selection
+        # NOTE: the position in µm is needed by the dock, Tab and when starting to move,
+        #       so it is converted once per selection change
+        self._selection_dposition = None if selection is None else selection.position.to_dtype(self.dbu)
         if not(self.setupDock):
             pass
         else:
             self.setupDock.updateSelection(selection)
 
+    @property
+    def selection_dposition(self) -> Optional[pya.DPoint]:
+        return self._selection_dposition
+
+    @staticmethod
+    def _selectable_object(o: pya.ObjectInstPath, 
+                           text_info: Optional[pya.TextInfo]) -> Optional[Union[Instance, ShapeOfInstance]]:
+        # NOTE: every access to an ObjectInstPath/Shape attribute crosses into KLayout (C++),
+        #       so we fetch each value only once per object, and avoid materializing
+        #       the full instance path just to check its length / get its first element
+        if o.path_length() == 0:  # a shape within the same cell has to be aligned
+            shape = o.shape
+            if shape is None:
+                return None
+            # NOTE: a text is only a point, so we use the effectively rendered BBox
+            if text_info is not None and shape.is_text():
+                bbox = text_info.bbox(shape)
+            else:
+                bbox = shape.bbox().transformed(o.source_trans())
+            return ShapeOfInstance(shape=shape, layer=o.layer, path=o, bbox=bbox)
+        else:  # the instance/shape is within subcells, we want to move only the top-most instance!
+            inst = o.path_nth(0).inst()
+            return Instance(instance=inst, path=o, bbox=inst.bbox())
+
     def selected_objects(self) -> Optional[MoveQuicklyToolSelection]:
         so = []
+        text_info = None
+        if 'TextInfo' in dir(pya):  # KLayout >= 0.30.5
+            text_info = pya.TextInfo(self.view)
         for o in self.view.each_object_selected():
-            if len(o.path) == 0:  # a shape within the same cell has to be aligned
-                if o.shape is not None:
-                    bbox = o.shape.bbox().transformed(o.source_trans())
-                    so += [ShapeOfInstance(shape=o.shape, layer=o.layer, path=o, bbox=bbox)]
-            else:  # the instance/shape is within subcells, we want to move only the top-most instance!
-                inst = o.path[0].inst()
-                bbox = inst.bbox()
-                so += [Instance(instance=inst, path=o, bbox=bbox)]
+            selectable_object = self._selectable_object(o, text_info)
+            if selectable_object is not None:
+                so.append(selectable_object)
         if len(so) == 0:
             return None
         # # Hotspot, don't log this
@@ -442,18 +624,19 @@ class MoveQuicklyToolPlugin(pya.Plugin):
         #    debug(f"MoveQuicklyToolPlugin: {len(so)} objects selected")
         return MoveQuicklyToolSelection(objects=so)
 
-    def _visible_left_dock_widgets(self) -> List[pya.QDockWidget]:
-        widgets = []
+    def _visible_left_dock_widgets(self) -> Iterator[pya.QDockWidget]:
+        # NOTE: generator, so that is_left_dock_visible() can stop at the first visible dock
+        #       instead of querying the dock area and visibility of every child widget
         mw = pya.MainWindow.instance()
+        left_area = pya.Qt.LeftDockWidgetArea
         for ch in mw.findChildren():
             if 'QDockWidget' not in ch.__class__.__name__:
                 continue
-            if mw.dockWidgetArea(ch) == pya.Qt.LeftDockWidgetArea and ch.isVisible():
-                widgets.append(ch)
-        return widgets
+            if mw.dockWidgetArea(ch) == left_area and ch.isVisible():
+                yield ch
         
     @staticmethod
-    def is_left_dock_visible(visible_left_dock_widgets: List[pya.QDockWidget]) -> bool:
+    def is_left_dock_visible(visible_left_dock_widgets: Iterable[pya.QDockWidget]) -> bool:
         for w in visible_left_dock_widgets:
             if Debugging.DEBUG:
                 debug(f"MoveQuicklyToolPlugin.is_left_dock_visible, "
@@ -465,7 +648,7 @@ class MoveQuicklyToolPlugin(pya.Plugin):
         return False
     
     def hide_left_dock_widgets(self):
-        visible_left_dock_widgets = self._visible_left_dock_widgets()
+        visible_left_dock_widgets = list(self._visible_left_dock_widgets())
         for w in visible_left_dock_widgets:
             if w.isVisible():
                 w.setVisible(False)
@@ -491,11 +674,15 @@ class MoveQuicklyToolPlugin(pya.Plugin):
 
         self.editor_options = EditorOptions(view=self.view)
         
+        self._invalidate_visible_layer_indexes()
+        self._connect_view_events()
+        
         # NOTE: only show the editor options if anything is shown in the left sidebar, but
         #       not if the user has deliberatly hidden it and it would "waste" horizontal screen space
         visible_left_dock_widgets = self._visible_left_dock_widgets()
         if self.is_left_dock_visible(visible_left_dock_widgets):
-            debug(f"MoveQuicklyToolPlugin.activated: show editor options dock widget")
+            if Debugging.DEBUG:
+                debug(f"MoveQuicklyToolPlugin.activated: show editor options dock widget")
             EditorOptions.show_editor_options()
         else:
             # FIXME: KLayout (at least >=0.30.4) seems to automatically show the editor options
@@ -514,11 +701,17 @@ class MoveQuicklyToolPlugin(pya.Plugin):
         self._clear_all_markers()
         self.selection = None
         self.is_dragging = False
+        self._reset_move()
+        self._commit_pending = False  # cancel a deferred commit
+        self._pending_commit_operation = None
 
         self._state = MoveQuicklyToolState.INACTIVE
         
         self.editor_options = None
         
+        self._disconnect_view_events()
+        self._invalidate_visible_layer_indexes()
+        
         self.ungrab_mouse()
         if self.setupDock:
             self.setupDock.hide()
@@ -535,6 +728,7 @@ class MoveQuicklyToolPlugin(pya.Plugin):
             debug(f"MoveQuicklyToolPlugin.configure, name={name}, value={value}")
         if self.editor_options is not None:
             self.editor_options.plugin_configure(name, value)
+            self._reanchor_move()  # the grid or snap settings might have changed
         return False
         
     def menu_activated(self, symbol: str) -> bool:
@@ -562,6 +756,10 @@ class MoveQuicklyToolPlugin(pya.Plugin):
         for marker in self.move_preview_markers:
             marker._destroy()
         self.move_preview_markers = []
+        self._last_preview_delta = None
+        self._preview_base_selection = None
+        self._preview_base_dbox = None
+        self._preview_base_dtexts = []
         
     def _clear_drag_selection_markers(self):
         for marker in self.drag_selection_markers:
@@ -572,67 +770,141 @@ class MoveQuicklyToolPlugin(pya.Plugin):
         self._clear_move_preview_markers()
         self._clear_drag_selection_markers()
         
-    def viewport_adjust(self, v: int) -> int:
-        trans = pya.CplxTrans(self.view.viewport_trans(), self.dbu)
-        return v / trans.mag
-        
     def update_move_preview_markers(self):
-        self._clear_move_preview_markers()
-        
         if self.selection is None:
+            self._clear_move_preview_markers()
             return
         
-        if self.state in (MoveQuicklyToolState.INACTIVE,
-                          MoveQuicklyToolState.SELECTING,
-                          MoveQuicklyToolState.DRAG_SELECTING):
+        state = self._state
+        if state in (MoveQuicklyToolState.INACTIVE,
+                     MoveQuicklyToolState.SELECTING,
+                     MoveQuicklyToolState.DRAG_SELECTING):
+            self._clear_move_preview_markers()
             return
-        elif self.state == MoveQuicklyToolState.MOVING:
+        elif state == MoveQuicklyToolState.MOVING:
             if self.move_operation is None:
+                self._clear_move_preview_markers()
                 return
             
             delta = self.move_operation.effective_delta()
             
-            preview_box = self.selection.bbox(self.view).to_dtype(self.dbu).moved(delta)
+            # NOTE: with snap-to-grid, most mouse moves don't change the effective delta,
+            #       so the markers are only updated if they are outdated
+            if self._last_preview_delta is not None and delta == self._last_preview_delta:
+                return
             
-            marker = pya.Marker(self.view)
-            marker.line_style     = 0
-            marker.line_width     = 2
-            marker.vertex_size    = 0 
-            marker.dither_pattern = 1
-            marker.set(preview_box)
-            self.move_preview_markers += [marker]
+            # NOTE: the markers and their untransformed geometry are created once per selection,
+            #       each update only moves the cached geometry and re-sets the markers
+            if self._preview_base_selection is not self.selection:
+                self._clear_move_preview_markers()
+                
+                dbu = self.dbu
+                self._preview_base_selection = self.selection
+                self._preview_base_dbox = self.selection.bbox.to_dtype(dbu)
+                self._preview_base_dtexts = [o.shape.text.to_dtype(dbu) 
+                                             for o in self.selection.text_objects]
+                
+                marker = pya.Marker(self.view)
+                marker.line_style     = 0
+                marker.line_width     = 2
+                marker.vertex_size    = 0 
+                marker.dither_pattern = 1
+                self.move_preview_markers += [marker]
+                
+                # add texts
+                self.move_preview_markers += [pya.Marker(self.view) for t in self._preview_base_dtexts]
+            
+            self._last_preview_delta = delta
+            
+            self.move_preview_markers[0].set(self._preview_base_dbox.moved(delta))
             
-            # add texts
-            for o in self.selection.objects:
-                if isinstance(o, ShapeOfInstance) and o.shape.is_text():
-                    text_marker = pya.Marker(self.view)
-                    dtext = o.shape.text.to_dtype(self.dbu).moved(delta)
-                    text_marker.set(dtext)
-                    self.move_preview_markers += [text_marker]
+            for text_marker, dtext in zip(self.move_preview_markers[1:], self._preview_base_dtexts):
+                text_marker.set(dtext.moved(delta))
         else:
-            raise NotImplementedError(f"update_move_preview_markers: unknown state {self.state}")
+            raise NotImplementedError(f"update_move_preview_markers: unknown state {state}")
         
     def update_drag_selection_markers(self):
-        self._clear_drag_selection_markers()
-        
-        if self.state in (MoveQuicklyToolState.INACTIVE,
-                          MoveQuicklyToolState.SELECTING,
-                          MoveQuicklyToolState.MOVING):
+        state = self._state
+        if state in (MoveQuicklyToolState.INACTIVE,
+                     MoveQuicklyToolState.SELECTING,
+                     MoveQuicklyToolState.MOVING):
+            self._clear_drag_selection_markers()
             return
-        elif self.state == MoveQuicklyToolState.DRAG_SELECTING:
+        elif state == MoveQuicklyToolState.DRAG_SELECTING:
             selection_box = pya.DBox(self.drag_selection_from_dpoint, self.drag_selection_to_dpoint)
 
-            marker = pya.Marker(self.view)
-            marker.line_style     = 2
-            marker.line_width     = 2
-            marker.vertex_size    = 0 
-            marker.dither_pattern = 1
-            marker.set(selection_box)
-            self.drag_selection_markers += [marker]
+            # NOTE: the marker is created once and then reused for each update (only its geometry changes)
+            if len(self.drag_selection_markers) == 0:
+                marker = pya.Marker(self.view)
+                marker.line_style     = 2
+                marker.line_width     = 2
+                marker.vertex_size    = 0 
+                marker.dither_pattern = 1
+                self.drag_selection_markers += [marker]
+            self.drag_selection_markers[0].set(selection_box)
         else:
-            raise NotImplementedError(f"update_drag_selection_markers: unknown state {self.state}")
+            raise NotImplementedError(f"update_drag_selection_markers: unknown state {state}")
+        
+    def _invalidate_visible_layer_indexes(self, *args):
+        self._visible_layer_indexes = None
+
+    def _on_viewport_changed(self, *args):
+        selection = self._selection
+        if selection is None or 'TextInfo' not in dir(pya):  # KLayout >= 0.30.5
+            return
+        if not selection.text_objects:
+            return
+        if not selection.refresh_text_bboxes(pya.TextInfo(self.view)):
+            return
+        
+        self.selection = selection  # refresh the cached position and the dock
+        self._preview_base_selection = None  # rebuild the preview geometry on the next update
+        
+        # NOTE: the anchor is derived from the selection position
+        self._reanchor_move()
+
+    def _reanchor_move(self):
+        if self._state != MoveQuicklyToolState.MOVING or self._move_anchor_orig_pos is None:
+            return
+        # NOTE: re-anchor like in _enter_moving and replay the last mouse move with the new anchor
+        self._move_from_snapped_dpoint = self.editor_options.snap_to_grid_if_necessary(self.move_from_dpoint)
+        self._move_anchor_orig_pos = self.selection_dposition
+        self._move_anchor_snapped_pos = self.editor_options.snap_to_grid_if_necessary(self._move_anchor_orig_pos)
+        self._last_snapped_to_cursor = None
+        op = self.move_operation
+        self.move_operation = None
+        if op is not None and not self._commit_pending:
+            self._pending_move_dpoint = op.to_cursor
+            if not self._move_update_scheduled:
+                self._move_update_scheduled = True
+                EventLoop.defer(self._flush_move_preview)
+
+    def _connect_view_events(self):
+        if self._view_events_connected:
+            return
+        self.view.on_layer_list_changed += self._invalidate_visible_layer_indexes
+        self.view.on_current_layer_list_changed += self._invalidate_visible_layer_indexes
+        self.view.on_active_cellview_changed += self._invalidate_visible_layer_indexes
+        self.view.on_cellview_changed += self._invalidate_visible_layer_indexes
+        self.view.on_viewport_changed += self._on_viewport_changed
+        self._view_events_connected = True
+
+    def _disconnect_view_events(self):
+        if not self._view_events_connected:
+            return
+        self.view.on_layer_list_changed -= self._invalidate_visible_layer_indexes
+        self.view.on_current_layer_list_changed -= self._invalidate_visible_layer_indexes
+        self.view.on_active_cellview_changed -= self._invalidate_visible_layer_indexes
+        self.view.on_cellview_changed -= self._invalidate_visible_layer_indexes
+        self.view.on_viewport_changed -= self._on_viewport_changed
+        self._view_events_connected = False
+
+    def visible_layer_indexes(self) -> Tuple[int, ...]:
+        # NOTE: the layer list rarely changes, so we cache the indexes while the tool is active,
+        #       the cache is invalidated by the view events (see _connect_view_events)
+        if self._visible_layer_indexes is not None:
+            return self._visible_layer_indexes
         
-    def visible_layer_indexes(self) -> List[int]:
         idxs = []
         for lref in self.view.each_layer():
             if lref.visible and lref.valid:
@@ -644,31 +916,37 @@ class MoveQuicklyToolPlugin(pya.Plugin):
                 #           f"marked={lref.marked} cellview={lref.cellview()}, "
                 #           f"source={lref.source}")
                 idxs.append(lref.layer_index())
-        return idxs
+        self._visible_layer_indexes = tuple(idxs)
+        return self._visible_layer_indexes
     
     def _select_objects(self, 
                         search_box: pya.DBox, 
                         selection_mode: pya.LayoutView.SelectionMode,
                         containment_constraint: ContainmentConstraint,
-                        allow_multiple: bool):
+                        allow_multiple: bool) -> bool:  # returns False if the selection did not change
         dpoint = search_box.p1   # for single click mode allow_multiple=False
         search_box = search_box.to_itype(self.dbu)
+        containment_matches = containment_constraint.compile(search_box)
+        cv_index = self.cell_view.index()
         visible_layer_indexes = self.visible_layer_indexes()
 
         selection_filter_options = SelectionFilterOptions.from_ui()
 
+        # NOTE: the iterators hand out a new Python wrapper for every shape/instance,
+        #       so we can't key by id(), but Shape/Instance implement value-based hashing
         already_added_objects: Set[Union[pya.Instance, pya.Shape]] = set()
         selected_objects: List[pya.ObjectInstPath]
 
         if selection_mode == pya.LayoutView.SelectionMode.Add:
             selected_objects = self.view.object_selection
             if self.selection:
-                already_added_objects |= set(self.selection.as_transformees())
+                already_added_objects.update(self.selection.as_transformees)
         elif selection_mode in (pya.LayoutView.SelectionMode.Replace,
                                 pya.LayoutView.SelectionMode.Invert):  # TODO: treat invert properly
             selected_objects = []
         else:
             raise NotImplementedError(f"_select_objects: unknown SelectionMode {selection_mode}")
+        previously_selected_count = len(selected_objects)
         
         text_info = None
         if 'TextInfo' in dir(pya):  # KLayout >= 0.30.5
@@ -680,94 +958,118 @@ class MoveQuicklyToolPlugin(pya.Plugin):
         
         top_cell = self.cell_view.cell
         if self.cell_view.is_cell_hidden(top_cell):
-            return
+            return False
         
         iteration_limit = 1000
         
         if self.view.max_hier_levels >= 1:
-            if selection_filter_options.include_instances():
+            # NOTE: the cell bbox is cached by KLayout, so we can cheaply skip 
+            #       the instance iterator if the search box is outside of the cell
+            top_cell_bbox = top_cell.bbox()
+            if selection_filter_options.include_instances() and top_cell_bbox.touches(search_box):
+                # NOTE: the iterator only delivers instances overlapping the search box,
+                #       so the (transformed) bbox is only required if the instance must be enclosed
+                check_inst_containment = containment_constraint != ContainmentConstraint.SEARCH_BOX_OVERLAPS_OBJECT
+                # NOTE: only the instances of the top cell are selectable,
+                #       max_depth=0 keeps the iterator from descending into the hierarchy at all
                 iter = top_cell.begin_instances_rec_overlapping(search_box)
                 iter.min_depth = 0
-                iter.max_depth = 1
+                iter.max_depth = 0
+                active_cellview_index = self.view.active_cellview_index
+                hidden_by_cell_index: Dict[int, bool] = {}
                 i = 0
                 while not iter.at_end():
-                    if len(iter.path()) == 0:
-                        inst = iter.current_inst_element().inst()
-                        if inst not in already_added_objects:
-                            inst_bbox_from_top = inst.bbox().transformed(iter.trans())
-                            if containment_constraint.matches(search_box, inst_bbox_from_top):
-                                hidden = self.view.is_cell_hidden(inst.cell.cell_index(), self.view.active_cellview_index)
-                                if not hidden:
-                                    p = pya.ObjectInstPath()
-                                    p.cv_index = self.view.active_cellview_index
-                                    p.append_path(iter.current_inst_element())
-                                    selected_objects.append(p)
-                                    already_added_objects.add(inst)
+                    inst_element = iter.current_inst_element()
+                    inst = inst_element.inst()
+                    if inst not in already_added_objects:
+                        if not check_inst_containment or \
+                           containment_matches(inst.bbox().transformed(iter.trans())):
+                            cell_index = inst.cell_index
+                            hidden = hidden_by_cell_index.get(cell_index)
+                            if hidden is None:
+                                hidden = self.view.is_cell_hidden(cell_index, active_cellview_index)
+                                hidden_by_cell_index[cell_index] = hidden
+                            if not hidden:
+                                p = pya.ObjectInstPath()
+                                p.cv_index = active_cellview_index
+                                p.append_path(inst_element)
+                                selected_objects.append(p)
+                                already_added_objects.add(inst)
                     iter.next()
                     i += 1
                     if i >= iteration_limit:
                         break
             
             if selection_filter_options.include_shapes():
+                # NOTE: A text is only a point, so there's a mismatch between the effectively rendered BBox.
+                #       So drag-selection would work (as the search_box encloses the point,
+                #       but if single-click mode selection is used, the search_box is only a point,
+                #       and selection does not work, as the two points virtually never touch.
+                #       Therefore we need a larger search box (e.g. screen window size) 
+                #       and we use TextInfo(LayoutView).bbox() to get the effective rendered BBox.
+                text_search_box: Optional[pya.Box] = None
+                if selection_filter_options.include_texts():
+                    vp_trans = self.view.viewport_trans()
+                    disp = vp_trans.disp / vp_trans.mag
+                    disp = disp.to_itype(self.dbu)
+                    dsize = pya.DVector(self.view.viewport_width(), self.view.viewport_height())
+                    dsize = dsize / vp_trans.mag
+                    
+                    x = -disp.x
+                    y = -disp.y
+                    size = dsize.to_itype(self.dbu)
+                    
+                    text_search_box = pya.Box(x, y, x + size.x, y + size.y)
+                    text_search_box = text_search_box.enlarged(10)  # extra oversize
+
+                check_shape_containment = containment_constraint != ContainmentConstraint.SEARCH_BOX_OVERLAPS_OBJECT
+                
                 for lyr in visible_layer_indexes:
-                    # NOTE: A text is only a point, so there's a mismatch between the effectively rendered BBox.
-                    #       So drag-selection would work (as the search_box encloses the point,
-                    #       but if single-click mode selection is used, the search_box is only a point,
-                    #       and selection does not work, as the two points virtually never touch.
-                    #       Therefore we need a larger search box (e.g. screen window size) 
-                    #       and we use TextInfo(LayoutView).bbox() to get the effective rendered BBox.
-                    if selection_filter_options.include_texts():
-                        vp_trans = self.view.viewport_trans()
-                        disp = vp_trans.disp / vp_trans.mag
-                        disp = disp.to_itype(self.dbu)
-                        dsize = pya.DVector(self.view.viewport_width(), self.view.viewport_height())
-                        dsize = dsize / vp_trans.mag
-                        
-                        x = -disp.x
-                        y = -disp.y
-                        size = dsize.to_itype(self.dbu)
-                        
-                        text_search_box = pya.Box(x, y, x + size.x, y + size.y)
-                        text_search_box = text_search_box.enlarged(10)  # extra oversize
-                        
+                    # NOTE: the per-layer bbox is cached by KLayout, 
+                    #       so we can cheaply skip layers which have no shapes near the search box
+                    layer_bbox = top_cell.bbox(lyr)
+                    if layer_bbox.empty():
+                        continue
+                    
+                    if text_search_box is not None and layer_bbox.touches(text_search_box):
                         iter = top_cell.begin_shapes_rec_touching(lyr, text_search_box)
                         iter.min_depth = 0
-                        iter.max_depth = 1
+                        iter.max_depth = 0  # only shapes of the top cell, don't descend into the hierarchy
                         iter.shape_flags = pya.Shapes.STexts
                         i = 0
                         while not iter.at_end():
-                            if len(iter.path()) == 0:
-                                sh = iter.shape()
-                                if selection_filter_options.include_shape(sh):
-                                    shape_box: pya.Box
-                                    if sh.is_text() and text_info is not None:
-                                        shape_box = text_info.bbox(sh)
-                                    else:
-                                        shape_box = sh.bbox()
-                                    if sh not in already_added_objects:
-                                        if containment_constraint.matches(search_box, shape_box):
-                                            p = pya.ObjectInstPath(iter, self.cell_view.index())
-                                            selected_objects.append(p)
-                                            already_added_objects.add(sh)
+                            sh = iter.shape()
+                            if sh not in already_added_objects and selection_filter_options.include_shape(sh):
+                                shape_box: pya.Box
+                                if sh.is_text() and text_info is not None:
+                                    shape_box = text_info.bbox(sh)
+                                else:
+                                    shape_box = sh.bbox()
+                                if containment_matches(shape_box):
+                                    p = pya.ObjectInstPath(iter, cv_index)
+                                    selected_objects.append(p)
+                                    already_added_objects.add(sh)
                             iter.next()
                             i += 1
                             if i >= iteration_limit:
                                 break
 
+                    if not layer_bbox.touches(search_box):
+                        continue
+
                     iter = top_cell.begin_shapes_rec_overlapping(lyr, search_box)
                     iter.min_depth = 0
-                    iter.max_depth = 1
+                    iter.max_depth = 0  # only shapes of the top cell, don't descend into the hierarchy
                     iter.shape_flags = pya.Shapes.SAll & ~pya.Shapes.STexts
                     i = 0
                     while not iter.at_end():
-                        if len(iter.path()) == 0:
-                            sh = iter.shape()
-                            if selection_filter_options.include_shape(sh):
-                                if sh not in already_added_objects:
-                                    if containment_constraint.matches(search_box, sh.bbox()):
-                                        p = pya.ObjectInstPath(iter, self.cell_view.index())
-                                        selected_objects.append(p)
-                                        already_added_objects.add(sh)
+                        sh = iter.shape()
+                        if sh not in already_added_objects and selection_filter_options.include_shape(sh):
+                            # NOTE: like for instances, the iterator only delivers overlapping shapes
+                            if not check_shape_containment or containment_matches(sh.bbox()):
+                                p = pya.ObjectInstPath(iter, cv_index)
+                                selected_objects.append(p)
+                                already_added_objects.add(sh)
                         iter.next()
                         i += 1
                         if i >= iteration_limit:
@@ -784,6 +1086,12 @@ class MoveQuicklyToolPlugin(pya.Plugin):
             if Debugging.DEBUG:
                 debug(f"action {action} / obj {obj} was chosen")
         
+        if selection_mode == pya.LayoutView.SelectionMode.Add and \
+           len(selected_objects) == previously_selected_count:
+            # NOTE: nothing new under the cursor (e.g. shift-click on an already selected object),
+            #       keep the current selection and its markers
+            return False
+        
         if len(selected_objects) >= 2 and not allow_multiple:
             # single object selection mode, we show the user a popupmenu with the available options
             menu = pya.QMenu()
@@ -815,26 +1123,43 @@ class MoveQuicklyToolPlugin(pya.Plugin):
                 selected_objects = []
                 
         self.view.object_selection = selected_objects
-        self.selection = self.selected_objects()
+        
+        if selection_mode == pya.LayoutView.SelectionMode.Add and \
+           self.selection is not None and \
+           len(self.selection.objects) == previously_selected_count:
+            # NOTE: the existing part of the selection is unchanged,
+            #       so only the newly added objects have to be wrapped, instead of re-reading the whole selection
+            objects = list(self.selection.objects)
+            for p in selected_objects[previously_selected_count:]:
+                selectable_object = self._selectable_object(p, text_info)
+                if selectable_object is not None:
+                    objects.append(selectable_object)
+            self.selection = MoveQuicklyToolSelection(objects=objects)
+        else:
+            self.selection = self.selected_objects()
+        return True
     
-    def select_object_at(self, dpoint: pya.DPoint, buttons: int):
-        if buttons & pya.ButtonState.ShiftKey:
+    def select_object_at(self, dpoint: pya.DPoint, buttons: int) -> bool:
+        if buttons & _SHIFT_KEY:
             selection_mode = pya.LayoutView.SelectionMode.Add
         else:
             selection_mode = pya.LayoutView.SelectionMode.Replace
-        self._select_objects(search_box=pya.DBox(dpoint, dpoint),
+        return self._select_objects(search_box=pya.DBox(dpoint, dpoint),
                              selection_mode=selection_mode,
                              containment_constraint=ContainmentConstraint.SEARCH_BOX_OVERLAPS_OBJECT,
                              allow_multiple=selection_mode == pya.LayoutView.SelectionMode.Add)
     
-    def select_objects_enclosed_by(self, search_box: pya.DBox, selection_mode: pya.LayoutView.SelectionMode):
-        self._select_objects(search_box=search_box,
+    def select_objects_enclosed_by(self, search_box: pya.DBox, selection_mode: pya.LayoutView.SelectionMode) -> bool:
+        return self._select_objects(search_box=search_box,
                              selection_mode=selection_mode,
                              containment_constraint=ContainmentConstraint.SEARCH_BOX_ENCLOSES_OBJECT,
                              allow_multiple=True)
         
     def mouse_moved_event(self, dpoint: pya.DPoint, buttons: int, prio: bool):
         if prio:
+            if self._commit_pending:
+                return True
+                
             # # Hotspot, don't log this
             # if Debugging.DEBUG:
             #     debug(f"mouse moved event, p={dpoint}, buttons={buttons}, prio={prio}")
@@ -842,33 +1167,35 @@ class MoveQuicklyToolPlugin(pya.Plugin):
             # NOTE: dragging will change the selection
             #       clicking (select object) and moving without dragging will show the move preview
             
-            if buttons & pya.ButtonState.LeftButton:  # drag selection
-                if self.state in (MoveQuicklyToolState.INACTIVE,
-                                  MoveQuicklyToolState.SELECTING,
-                                  MoveQuicklyToolState.MOVING):
+            if buttons & _LEFT_BUTTON:  # drag selection
+                state = self._state
+                if state in (MoveQuicklyToolState.INACTIVE,
+                             MoveQuicklyToolState.SELECTING,
+                             MoveQuicklyToolState.MOVING):
+                    if state == MoveQuicklyToolState.MOVING:
+                        self._reset_move()
                     self.state = MoveQuicklyToolState.DRAG_SELECTING
+                    self._clear_move_preview_markers()
                     # NOTE: the from point is directly recorded via mouse_button_pressed_event, because some drag events could be skipped!
                     self.drag_selection_to_dpoint = dpoint
-                elif self.state == MoveQuicklyToolState.DRAG_SELECTING:
+                elif state == MoveQuicklyToolState.DRAG_SELECTING:
+                    if self.drag_selection_to_dpoint is not None and dpoint == self.drag_selection_to_dpoint:
+                        return True  # nothing changed, e.g. duplicate events
                     self.drag_selection_to_dpoint = dpoint
                 else:
-                    raise NotImplementedError(f"mouse_moved_event: unknown state {self.state}")
+                    raise NotImplementedError(f"mouse_moved_event: unknown state {state}")
                 
                 if self.drag_selection_from_dpoint is None:
                     return False
                 
-                selection_mode: pya.LayoutView.SelectionMode
-                if buttons & pya.ButtonState.ShiftKey:
-                    selection_mode = pya.LayoutView.SelectionMode.Add
-                else:
-                    selection_mode = pya.LayoutView.SelectionMode.Replace
-                
-                self._clear_move_preview_markers()
-                self.select_objects_enclosed_by(pya.DBox(self.drag_selection_from_dpoint, self.drag_selection_to_dpoint), selection_mode)
-                
-                self.update_drag_selection_markers()
+                # NOTE: while dragging, we only draw the selection rectangle,
+                #       the objects are selected once the mouse button is released
+                #       like for moving, the marker update is coalesced per event loop iteration
+                if not self._drag_update_scheduled:
+                    self._drag_update_scheduled = True
+                    EventLoop.defer(self._flush_drag_selection_markers)
                 return True
-            elif buttons & pya.ButtonState.ShiftKey:
+            elif buttons & _SHIFT_KEY:
                 state = MoveQuicklyToolState.SELECTING
                 self._clear_move_preview_markers()
                 return True
@@ -876,35 +1203,129 @@ class MoveQuicklyToolPlugin(pya.Plugin):
                 # # Hotspot, don't log this
                 # if Debugging.DEBUG:
                 #     debug(f"mouse drag event, p={dpoint}, buttons={buttons}, prio={prio}")
-                if self.state == MoveQuicklyToolState.MOVING:
-                    snapped_from_cursor = self.editor_options.snap_to_grid_if_necessary(self.move_from_dpoint)
-                    snapped_to_cursor = self.editor_options.snap_to_grid_if_necessary(dpoint)
-                    constrained_to_cursor = self.editor_options.constrain_angle(origin=snapped_from_cursor, destination=snapped_to_cursor)
-                    
-                    delta = constrained_to_cursor - snapped_from_cursor
-                    
-                    orig_pos = self.selection.position(self.view).to_dtype(self.dbu)
-                    pos = self.editor_options.snap_to_grid_if_necessary(orig_pos)
-                    
-                    self.move_operation = MouseMoveOperation(original_position=orig_pos, 
-                                                             snapped_position=pos, 
-                                                             from_cursor=self.move_from_dpoint,
-                                                             to_cursor=dpoint,
-                                                             snapped_cursor_delta=delta)
-                    self.setupDock.updatePositionValues(pos.x + delta.x,
-                                                        pos.y + delta.y,
-                                                        delta.x, 
-                                                        delta.y)
-                    self.update_move_preview_markers()
-                    
+                if self._state == MoveQuicklyToolState.MOVING:
+                    # NOTE: mouse move events can arrive much faster than we need to update the preview,
+                    #       so we only record the latest position, and process it once per event loop iteration
+                    self._pending_move_dpoint = dpoint
+                    if not self._move_update_scheduled:
+                        self._move_update_scheduled = True
+                        EventLoop.defer(self._flush_move_preview)
                     return True
         return False
 
+    def _flush_drag_selection_markers(self):
+        self._drag_update_scheduled = False
+        if self._state != MoveQuicklyToolState.DRAG_SELECTING:
+            return
+        self.update_drag_selection_markers()
+
+    def _snapped_move_delta(self, dpoint: pya.DPoint) -> Optional[pya.DVector]:
+        # NOTE: the start cursor and the anchor are snapped once in _enter_moving,
+        #       so per mouse move there is only one snap and one angle constraint left
+        editor_options = self.editor_options
+        snapped_to_cursor = editor_options.snap_to_grid_if_necessary(dpoint)
+        
+        # NOTE: many mouse move events don't change the snapped cursor (sub-grid or even duplicate events)
+        last = self._last_snapped_to_cursor
+        if last is not None and \
+           abs(snapped_to_cursor.x - last.x) + abs(snapped_to_cursor.y - last.y) < self.dbu * 0.5:
+            return None
+        self._last_snapped_to_cursor = snapped_to_cursor
+        
+        snapped_from_cursor = self._move_from_snapped_dpoint
+        constrained_to_cursor = editor_options.constrain_angle(origin=snapped_from_cursor, destination=snapped_to_cursor)
+        return constrained_to_cursor - snapped_from_cursor
+        
+    def _flush_move_preview(self):
+        self._move_update_scheduled = False
+        
+        dpoint = self._pending_move_dpoint
+        self._pending_move_dpoint = None
+        if dpoint is None:
+            return
+        if self._state != MoveQuicklyToolState.MOVING or self.selection is None or \
+           self._move_anchor_orig_pos is None:
+            return
+        
+        delta = self._snapped_move_delta(dpoint)
+        if delta is None:
+            return
+        
+        # NOTE: the selection doesn't change while moving, so the anchor is computed once when we start moving
+        orig_pos = self._move_anchor_orig_pos
+        pos = self._move_anchor_snapped_pos
+        
+        # NOTE: the operation is created once per move and updated in place afterwards
+        op = self.move_operation
+        if op is not None and delta == op.snapped_cursor_delta:
+            return  # e.g. the angle constraint maps the cursor onto the same point, nothing to update
+        if op is None:
+            self.move_operation = MouseMoveOperation(original_position=orig_pos, 
+                                                     snapped_position=pos, 
+                                                     from_cursor=self.move_from_dpoint,
+                                                     to_cursor=dpoint,
+                                                     snapped_cursor_delta=delta)
+        else:
+            op.to_cursor = dpoint
+            op.snapped_cursor_delta = delta
+        # NOTE: no need to feed the spin boxes while the dock is hidden,
+        #       they are refreshed by the next mouse move once it is shown again
+        if self.setupDock.is_shown:
+            self.setupDock.updatePositionValues(pos.x + delta.x,
+                                                pos.y + delta.y,
+                                                delta.x, 
+                                                delta.y)
+        self.update_move_preview_markers()
+
     def mouse_button_pressed_event(self, dpoint: pya.DPoint, buttons: int, prio: bool) -> bool:
         # NOTE: directly record drag selection origin, because some drag events could be skipped!
         self.drag_selection_from_dpoint = dpoint
         return False
 
+    def _ignore_mouse_event(self, dpoint: pya.DPoint, buttons: int, shift: bool) -> bool:
+        return False
+        
+    def _enter_moving(self, dpoint: pya.DPoint):
+        self.state = MoveQuicklyToolState.MOVING
+        self.move_from_dpoint = dpoint
+        # NOTE: the selection and the start cursor don't change while moving,
+        #       so the anchors are snapped once here instead of on every mouse move
+        self._move_from_snapped_dpoint = self.editor_options.snap_to_grid_if_necessary(dpoint)
+        self._move_anchor_orig_pos = self.selection_dposition
+        self._move_anchor_snapped_pos = self.editor_options.snap_to_grid_if_necessary(self._move_anchor_orig_pos)
+        self._last_snapped_to_cursor = None
+        self.move_operation = None
+        
+    def _reset_move(self):
+        # NOTE: called on every exit from MOVING, so a cancelled move can't be committed later
+        self.move_operation = None
+        self._pending_move_dpoint = None
+        self._move_from_snapped_dpoint = None
+        self._move_anchor_orig_pos = None
+        self._move_anchor_snapped_pos = None
+        self._last_snapped_to_cursor = None
+        
+    def _released_while_selecting(self, dpoint: pya.DPoint, buttons: int, shift: bool) -> bool:
+        if self.selection is not None and not shift:
+            self._enter_moving(dpoint)
+            return True
+        return False
+        
+    def _released_while_drag_selecting(self, dpoint: pya.DPoint, buttons: int, shift: bool) -> bool:
+        if self.drag_selection_from_dpoint is not None:
+            selection_mode: pya.LayoutView.SelectionMode
+            if shift:
+                selection_mode = pya.LayoutView.SelectionMode.Add
+            else:
+                selection_mode = pya.LayoutView.SelectionMode.Replace
+            self.select_objects_enclosed_by(pya.DBox(self.drag_selection_from_dpoint, dpoint), selection_mode)
+        
+        self._clear_drag_selection_markers()
+        self.drag_selection_from_dpoint = None
+        self.drag_selection_to_dpoint = None
+        self.state = MoveQuicklyToolState.SELECTING
+        return True
+
     def mouse_button_released_event(self, dpoint: pya.DPoint, buttons: int, prio: bool) -> bool:
         if Debugging.DEBUG:
             debug(f"mouse button released event, p={dpoint}, buttons={buttons}, prio={prio}")
@@ -915,55 +1336,57 @@ class MoveQuicklyToolPlugin(pya.Plugin):
             self.drag_selection_to_dpoint = None
             return True
 
-        if self.state == MoveQuicklyToolState.INACTIVE:
-            pass
-        elif self.state == MoveQuicklyToolState.SELECTING:
-            if self.selection is not None and not buttons & pya.ButtonState.ShiftKey:
-                self.state = MoveQuicklyToolState.MOVING
-                self.move_from_dpoint = dpoint
-                return True                        
-        elif self.state == MoveQuicklyToolState.DRAG_SELECTING:
-            self._clear_drag_selection_markers()
-            self.drag_selection_from_dpoint = None
-            self.drag_selection_to_dpoint = None
+        handler = self._released_handlers.get(self._state)
+        if handler is None:
+            raise NotImplementedError(f"mouse_button_released_event: unknown state {self._state}")
+        return handler(dpoint, buttons, bool(buttons & _SHIFT_KEY))
+
+    def _left_click_while_selecting(self, dpoint: pya.DPoint, buttons: int, shift: bool) -> bool:
+        if self.selection is None or shift:
+            if self.select_object_at(dpoint, buttons):
+                self._clear_all_markers()
+            
+        if self.selection is not None and not shift:
+            self._enter_moving(dpoint)
+        if Debugging.DEBUG:
+            debug(f"State {MoveQuicklyToolState.SELECTING} → self.state: selection={self.selection}, move_from_dpoint={self.move_from_dpoint}")
+        return True
+        
+    def _left_click_while_moving(self, dpoint: pya.DPoint, buttons: int, shift: bool) -> bool:
+        if shift:
+            self._reset_move()
+            self.select_object_at(dpoint, buttons)
+            self._clear_all_markers()
             self.state = MoveQuicklyToolState.SELECTING
-            return True
-        elif self.state == MoveQuicklyToolState.MOVING:
-            pass
-        else:
-            raise NotImplementedError(f"mouse_button_released_event: unknown state {self.state}")
-                
-        return False
+        elif self.selection is not None:
+            self._flush_move_preview()  # the latest mouse move might not be processed yet
+            # NOTE: the commit is O(N) in the selection size, so it is deferred out of the click handler,
+            #       the preview is hidden right away, further mouse events are ignored until the commit ran
+            self._clear_all_markers()
+            self._commit_pending = True
+            self._pending_commit_operation = self.move_operation
+            self.move_operation = None  # owned by the deferred commit now, must not be committed twice
+            EventLoop.defer(self._flush_commit_move)
+        return True
+        
+    def _flush_commit_move(self):
+        if not self._commit_pending:
+            return  # cancelled, e.g. the tool was deactivated in the meantime
+        operation = self._pending_commit_operation
+        self._commit_pending = False
+        self._pending_commit_operation = None
+        self.commit_move(operation)
 
     def mouse_click_event(self, dpoint: pya.DPoint, buttons: int, prio: bool) -> bool:
         if prio:
-            if buttons & pya.ButtonState.LeftButton:
-                if self.state == MoveQuicklyToolState.INACTIVE:
-                    pass
-                elif self.state == MoveQuicklyToolState.SELECTING:
-                    if self.selection is None or buttons & pya.ButtonState.ShiftKey:
-                        self._clear_all_markers()
-                        self.select_object_at(dpoint, buttons)
-                        
-                    if self.selection is not None and not buttons & pya.ButtonState.ShiftKey:
-                        self.state = MoveQuicklyToolState.MOVING
-                        self.move_from_dpoint = dpoint
-                    if Debugging.DEBUG:
-                        debug(f"State {MoveQuicklyToolState.SELECTING} → self.state: selection={self.selection}, move_from_dpoint={self.move_from_dpoint}")
-                    return True                        
-                elif self.state == MoveQuicklyToolState.DRAG_SELECTING:
-                    pass
-                elif self.state == MoveQuicklyToolState.MOVING:
-                    if buttons & pya.ButtonState.ShiftKey:
-                        self.select_object_at(dpoint, buttons)
-                        self._clear_all_markers()
-                        self.state = MoveQuicklyToolState.SELECTING
-                    elif self.selection is not None:
-                        self.commit_move(self.move_operation)
-                    return True                        
-                else:
-                    raise NotImplementedError(f"mouse_click_event: unknown state {self.state}")
-            elif buttons in [pya.ButtonState.RightButton]:
+            if self._commit_pending:
+                return True
+            if buttons & _LEFT_BUTTON:
+                handler = self._left_click_handlers.get(self._state)
+                if handler is None:
+                    raise NotImplementedError(f"mouse_click_event: unknown state {self._state}")
+                return handler(dpoint, buttons, bool(buttons & _SHIFT_KEY))
+            elif buttons == _RIGHT_BUTTON:
                 self._clear_all_markers()
                 self.view.clear_selection()
                 self.selection = None
@@ -976,10 +1399,14 @@ class MoveQuicklyToolPlugin(pya.Plugin):
         if Debugging.DEBUG:
             debug(f"key_event: key={key}, buttons={buttons}")
         
-        if buttons & pya.ButtonState.ShiftKey and \
+        if self._commit_pending:
+            return True
+        
+        if buttons & _SHIFT_KEY and \
            self.state == MoveQuicklyToolState.MOVING:
             if Debugging.DEBUG:
                 debug("key_event: shift cancels moving!")
+            self._reset_move()
             self.state = MoveQuicklyToolState.SELECTING
             self._clear_move_preview_markers()
             return True
@@ -987,21 +1414,25 @@ class MoveQuicklyToolPlugin(pya.Plugin):
         if key == pya.KeyCode.Tab:
             if Debugging.DEBUG:
                 debug("key_event: tab!")
-            if self.selection is not None:
-                orig_pos = self.selection.position(self.view).to_dtype(self.dbu)
-                self.setupDock.updatePositionValues(orig_pos.x,
-                                                    orig_pos.y,
-                                                    0.0, 0.0)
+            selection = self.selection
+            if selection is not None:
+                dock = self.setupDock
+                orig_pos = self.selection_dposition
+                dock.updatePositionValues(orig_pos.x,
+                                          orig_pos.y,
+                                          0.0, 0.0)
                 self._clear_move_preview_markers()
-                self.setupDock.navigateToNextTextField()
+                dock.navigateToNextTextField()
                 return True
             
         elif key in (pya.KeyCode.Enter, pya.KeyCode.Return):
             if Debugging.DEBUG:
                 debug("key_event: enter!")
-            if self.selection is not None:
-                self.commit_move()
-                return True
+            if self._state == MoveQuicklyToolState.MOVING and self.selection is not None:
+                self._flush_move_preview()  # the latest mouse move might not be processed yet
+                if self.move_operation is not None:
+                    self.commit_move(self.move_operation)
+                    return True
                     
         return False
         
@@ -1010,6 +1441,7 @@ class MoveQuicklyToolPlugin(pya.Plugin):
             debug(f"commit_move: operation={operation}")
             
         self._clear_all_markers()
+        self._reset_move()
         
         if self.selection is None:
             self.state = MoveQuicklyToolState.SELECTING
@@ -1019,28 +1451,39 @@ class MoveQuicklyToolPlugin(pya.Plugin):
             self.state = MoveQuicklyToolState.SELECTING
             return
 
+        selection = self.selection
+        if len(selection.objects) == 0:  # nothing to move, don't open a transaction
+            self.state = MoveQuicklyToolState.SELECTING
+            return
+
         delta = operation.effective_delta()
+        if delta.x == 0 and delta.y == 0:  # nothing to move, don't open a transaction
+            self.state = MoveQuicklyToolState.SELECTING
+            return
+        
+        # NOTE: transform() updates the ObjectInstPath objects in place, so the paths
+        #       can be collected before the move
+        selection_paths: List[pya.ObjectInstPath] = [o.path for o in selection.objects]
         
         self.view.transaction("move quickly")
         try:
-            trans = pya.DTrans(delta.x, delta.y)
-            self.selection.transform(trans)
+            trans = pya.DTrans(delta)  # displacement only, built from the vector directly
+            selection.transform(trans, self.dbu)
         finally:
             self.view.commit()
-
             self.state = MoveQuicklyToolState.SELECTING
             
-            # NOTE: one problem in KLayout 0.30.3 is that transforming instances
-            #       will deselect them, so we need to re-select them
-            def reselect_selection():
-                selection_paths: List[pya.ObjectInstPath] = [o.path for o in self.selection.objects]
-                self.view.object_selection = selection_paths
-            
-            # keep selection of the LayoutView
-            # NOTE: do not deactivate, stay in M-mode!
-              
-            reselect_selection()
-            self.selection = self.selected_objects()  # re-new position after move
+        # NOTE: only reached if the transform succeeded, otherwise the paths might be stale
+        
+        # NOTE: one problem in KLayout 0.30.3 is that transforming instances
+        #       will deselect them, so we need to re-select them
+        # keep selection of the LayoutView
+        # NOTE: do not deactivate, stay in M-mode!
+        self.view.object_selection = selection_paths
+        
+        # NOTE: the selection already tracked the move (paths and bounding boxes),
+        #       re-assigning it is enough to refresh the position shown in the dock
+        self.selection = selection
 
 
 class MoveQuicklyToolPluginFactory(pya.PluginFactory):